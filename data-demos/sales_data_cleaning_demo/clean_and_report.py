@@ -1,12 +1,179 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from reportlab.lib.pagesizes import LETTER
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+
+# matplotlib and reportlab are imported where they are used, so an empty
+# input only pays for the pandas import
+
+# Raw exports use M/D/YYYY; the rest are fallbacks for hand-edited files
+_DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "ISO8601", "mixed")
+
+
+def _fast_to_datetime(s, formats=_DATE_FORMATS):
+    """Parse dates with explicit formats, using "mixed" only for leftover rows."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    # pandas 2.x does not count PyArrow dates/timestamps as datetime64
+    if isinstance(s.dtype, pd.ArrowDtype) and s.dtype.kind == "M":
+        return s.astype("datetime64[ns]")
+    # Exports repeat the same day many times, so parse each distinct string once
+    codes, uniq = pd.factorize(s)
+    if len(uniq) == 0:
+        return pd.to_datetime(s, errors="coerce")
+    uniq = pd.Series(uniq, dtype="string")
+    parsed = pd.Series(pd.NaT, index=uniq.index, dtype="datetime64[ns]")
+    for fmt in formats:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        # Formats can resolve to different units, so align them before assigning
+        parsed[missing] = pd.to_datetime(
+            uniq[missing], format=fmt, errors="coerce"
+        ).astype("datetime64[ns]")
+    # Code -1 marks missing input and is filled with NaT
+    values = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=s.index, name=s.name)
+
+
+def _read_raw_csv(path, date_cols=(), dtypes=None):
+    """Load a raw CSV with the PyArrow parser, falling back to the C parser.
+
+    Columns in ``dtypes`` are typed by the parser itself. If one of them holds
+    a value that type cannot take (text, or a fraction in an integer column),
+    the file is re-read untyped and those columns are coerced, with bad values
+    becoming NA.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    parse_dates = [c for c in date_cols if c in header]
+    dtype_map = {c: t for c, t in (dtypes or {}).items() if c in header}
+
+    def read(dtype):
+        try:
+            return pd.read_csv(
+                path,
+                engine="pyarrow",
+                dtype_backend="pyarrow",
+                dtype=dtype,
+                parse_dates=parse_dates,
+            )
+        except ImportError:
+            return pd.read_csv(path, engine="c", dtype=dtype, parse_dates=parse_dates)
+
+    try:
+        return read(dtype_map)
+    except (ValueError, TypeError):
+        df = read(None)
+        for col in dtype_map:
+            # On a PyArrow column, coerced cells would come back as NaN rather
+            # than NA and slip past fillna, so coerce through plain objects
+            df[col] = pd.to_numeric(df[col].astype(object), errors="coerce")
+        return df
+
+
+def _write_csv(df, path):
+    """Write a CSV with PyArrow's multithreaded writer, falling back to pandas."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df.to_csv(path, index=False)
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Match pandas: timestamps that are all midnight are written as plain dates
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            col = table.column(i)
+            dates = col.cast(pa.date32())
+            if pc.all(pc.equal(dates.cast(field.type), col)).as_py():
+                table = table.set_column(i, field.name, dates)
+    pacsv.write_csv(table, str(path), pacsv.WriteOptions(quoting_style="needed"))
+
+
+def _drop_duplicate_records(df, key):
+    """Drop repeated records, matching on ``key`` wherever a row has one."""
+    if key not in df.columns:
+        return df.drop_duplicates()
+    keyed = df[key].notna().to_numpy()
+    if keyed.all():
+        return df.drop_duplicates(subset=[key])
+    dupes = df.duplicated(subset=[key]).to_numpy() & keyed
+    # A row without a key only counts as a duplicate if every column matches
+    dupes[~keyed] = df[~keyed].duplicated().to_numpy()
+    return df[~dupes]
+
+
+@lru_cache(maxsize=None)
+def _table_style():
+    """Shared by every report table: grey header row, thin grid, bold header text."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ]
+    )
+
+
+def _revenue_sum(df, keys, dropna=True):
+    """Unsorted revenue total per group; only reads df, so safe on a worker thread."""
+    return df.groupby(keys, sort=False, observed=True, dropna=dropna)["revenue"].sum()
+
+
+def _styled_table(rows):
+    """Left-aligned report table using the shared header/grid style."""
+    from reportlab.platypus import Table
+
+    table = Table(rows, hAlign="LEFT")
+    table.setStyle(_table_style())
+    return table
+
+
+def _emit_empty_report(pdf_path):
+    """Write a title-only PDF for an input file with no rows."""
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph("Enterprise Sales Summary", styles["Title"]),
+        Spacer(1, 12),
+        Paragraph("The input file contains no sales records.", styles["BodyText"]),
+    ]
+    SimpleDocTemplate(str(pdf_path), pagesize=LETTER).build(story)
+
+
+def _fill_median_int(s):
+    """Cleaner for counts: fill gaps with the median and store as int32."""
+    return s.fillna(int(s.median())).astype("int32")
+
+
+def _fill_median_float(s):
+    """Cleaner for amounts: fill gaps with the median and store as float32."""
+    return s.fillna(s.median()).astype("float32")
 
 
+def _filled_category(default):
+    """Cleaner that fills missing labels with ``default`` and casts to category."""
+    return lambda s: s.fillna(default).astype("category")
+
+
+# Column -> cleaner, applied to whichever columns the raw file has. Labels
+# become category so the groupbys below hash integer codes, not strings.
+_CLEANERS = [
+    ("quantity", _fill_median_int),
+    ("price", _fill_median_float),
+    ("product", _filled_category("Unknown")),
+    ("region", _filled_category("Unknown")),
+    ("customer", _filled_category("Unknown")),
+]
+
 
 def main():
     base = Path(".")
@@ -16,57 +183,53 @@ def main():
     summary_pdf_path = base / "sales_summary.pdf"
 
     # ---------- 1) Load raw data ----------
-    df_raw = pd.read_csv(raw_path)
+    df_raw = _read_raw_csv(
+        raw_path, date_cols=["date"], dtypes={"quantity": "Int32", "price": "Float32"}
+    )
+    if len(df_raw) == 0:
+        _write_csv(df_raw, clean_path)
+        _emit_empty_report(summary_pdf_path)
+        print("Done → (no rows in input)")
+        print(f"  - {clean_path}")
+        print(f"  - {summary_pdf_path}")
+        return
 
     # ---------- 2) Basic cleaning ----------
     before = len(df_raw)
-    df = df_raw.drop_duplicates()
+    # order_id identifies an order; rows without one are compared in full
+    df = _drop_duplicate_records(df_raw, "order_id")
     after = len(df)
     removed_dupes = before - after
 
-    # Normalize columns
-    has_qty = "quantity" in df.columns
-    has_price = "price" in df.columns
-    has_product = "product" in df.columns
-    has_region = "region" in df.columns
-    has_customer = "customer" in df.columns
-
-    # Parse dates
+    # Parse dates (no-op when read_csv already parsed the column)
     if "date" in df.columns:
-        df["order_date"] = pd.to_datetime(df["date"], errors="coerce")
+        df["order_date"] = _fast_to_datetime(df["date"])
     else:
         df["order_date"] = pd.NaT
 
-    # Quantity & price
-    if has_qty:
-        df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce")
-        qty_med = df["quantity"].median()
-        df["quantity"] = df["quantity"].fillna(qty_med).astype(int)
-
-    if has_price:
-        df["price"] = pd.to_numeric(df["price"], errors="coerce")
-        price_med = df["price"].median()
-        df["price"] = df["price"].fillna(price_med)
-
-    # Categorical cleanup
-    if has_product:
-        df["product"] = df["product"].fillna("Unknown")
-    if has_region:
-        df["region"] = df["region"].fillna("Unknown")
-    if has_customer:
-        df["customer"] = df["customer"].fillna("Unknown")
+    # Run every applicable cleaner and write the results back in one assign()
+    df = df.assign(
+        **{col: clean(df[col]) for col, clean in _CLEANERS if col in df.columns}
+    )
+    cols = set(df.columns)
 
     # Revenue
-    if has_qty and has_price:
-        df["revenue"] = df["quantity"] * df["price"]
+    if {"quantity", "price"} <= cols:
+        qty = df["quantity"].to_numpy(dtype=np.int32, copy=False)
+        price = df["price"].to_numpy(dtype=np.float32, copy=False)
+        df["revenue"] = qty.astype(np.float32, copy=False) * price
 
     has_revenue = "revenue" in df.columns
 
     # Save cleaned data
-    df.to_csv(clean_path, index=False)
+    _write_csv(df, clean_path)
 
     # ---------- 3) Enterprise-style metrics ----------
 
+    # Sum money in float64: float32 totals lose cents above ~$130k
+    if has_revenue:
+        df["revenue"] = df["revenue"].astype("float64")
+
     # Deal count = number of orders
     deals_count = df["order_id"].nunique() if "order_id" in df.columns else len(df)
 
@@ -78,22 +241,53 @@ def main():
         total_revenue = None
         avg_deal_size = None
 
+    # Month buckets as integer YYYYMM (NA when the order date is missing)
+    has_months = has_revenue and df["order_date"].notna().any()
+    if has_months:
+        order_dt = df["order_date"].dt
+        df["year_month"] = (order_dt.year * 100 + order_dt.month).astype("Int32")
+
+    # The region, product and customer groupbys are independent, and pandas
+    # releases the GIL inside its groupby-sum kernels, so run them side by side.
+    # Name -> (group keys, dropna); the customer x month cube keeps undated
+    # orders so they still count toward per-customer totals.
+    groupings = {}
+    if has_revenue:
+        for col in ("region", "product"):
+            if col in cols:
+                groupings[col] = (col, True)
+        if "customer" in cols:
+            if has_months:
+                groupings["customer"] = (["customer", "year_month"], False)
+            else:
+                groupings["customer"] = ("customer", True)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        jobs = {
+            name: pool.submit(_revenue_sum, df, keys, dropna)
+            for name, (keys, dropna) in groupings.items()
+        }
+    sums = {name: job.result() for name, job in jobs.items()}
+
+    # One customer x month aggregation feeds CLTV, monthly revenue and churn
+    cube = sums.get("customer") if has_months else None
+
     # CLTV (approx) – average revenue per customer over dataset window
-    if has_customer and has_revenue:
-        rev_per_customer = df.groupby("customer")["revenue"].sum()
+    if cube is not None:
+        rev_per_customer = cube.groupby(level="customer", observed=True).sum()
+        avg_cltv = rev_per_customer.mean()
+    elif "customer" in sums:
+        rev_per_customer = sums["customer"]
         avg_cltv = rev_per_customer.mean()
     else:
         rev_per_customer = pd.Series(dtype=float)
         avg_cltv = None
 
     # Monthly revenue & revenue growth (last month vs previous)
-    if has_revenue and df["order_date"].notna().any():
-        df["year_month"] = df["order_date"].dt.to_period("M")
-        monthly_rev = (
-            df.groupby("year_month")["revenue"]
-            .sum()
-            .sort_index()
-        )
+    if has_months:
+        if cube is not None:
+            monthly_rev = cube.groupby(level="year_month").sum().sort_index()
+        else:
+            monthly_rev = df.groupby("year_month")["revenue"].sum().sort_index()
         if len(monthly_rev) >= 2:
             last_rev = monthly_rev.iloc[-1]
             prev_rev = monthly_rev.iloc[-2]
@@ -108,20 +302,27 @@ def main():
         revenue_growth_pct = None
 
     # Churn rate (approx) – customers active in prev month but not in last month
-    if has_customer and df.get("year_month") is not None and not monthly_rev.empty:
+    if cube is not None and not monthly_rev.empty:
         last_period = monthly_rev.index[-1]
         prev_period = monthly_rev.index[-2] if len(monthly_rev) >= 2 else None
 
         if prev_period is not None:
-            prev_customers = set(
-                df.loc[df["year_month"] == prev_period, "customer"].dropna().unique()
+            # Each (customer, month) pair appears once in the cube, so the
+            # customer codes per month are already unique
+            customer_codes = cube.index.codes[0]
+            months = cube.index.get_level_values("year_month").to_numpy(
+                dtype=np.int32, na_value=0
             )
-            last_customers = set(
-                df.loc[df["year_month"] == last_period, "customer"].dropna().unique()
-            )
-            if prev_customers:
-                churned_customers = prev_customers - last_customers
-                churn_rate = len(churned_customers) / len(prev_customers) * 100.0
+            # prev/last are the two latest months, so one comparison selects
+            # both and the split between them only touches that slice
+            recent = months >= prev_period
+            recent_codes = customer_codes[recent]
+            in_last = months[recent] == last_period
+            prev_customers = recent_codes[~in_last]
+            last_customers = recent_codes[in_last]
+            if prev_customers.size:
+                retained = np.isin(prev_customers, last_customers, assume_unique=True)
+                churn_rate = (1 - retained.mean()) * 100.0
             else:
                 churn_rate = None
         else:
@@ -130,33 +331,21 @@ def main():
         churn_rate = None
 
     # Revenue by region
-    if has_region and has_revenue:
-        rev_by_region = (
-            df.groupby("region")["revenue"]
-            .sum()
-            .sort_values(ascending=False)
-            .reset_index()
-        )
+    if "region" in sums:
+        rev_by_region = sums["region"].sort_values(ascending=False).reset_index()
     else:
         rev_by_region = pd.DataFrame(columns=["region", "revenue"])
 
     # Top products by revenue
-    if has_product and has_revenue:
-        top_products = (
-            df.groupby("product")["revenue"]
-            .sum()
-            .sort_values(ascending=False)
-            .head(10)
-            .reset_index()
-        )
+    if "product" in sums:
+        top_products = sums["product"].nlargest(10).rename("revenue").reset_index()
     else:
         top_products = pd.DataFrame(columns=["product", "revenue"])
 
     # Top customers by lifetime value
     if not rev_per_customer.empty:
         top_customers = (
-            rev_per_customer.sort_values(ascending=False)
-            .head(10)
+            rev_per_customer.nlargest(10)
             .rename("revenue")
             .reset_index()
         )
@@ -166,17 +355,30 @@ def main():
     # ---------- 4) Chart: Top products by revenue ----------
     chart_generated = False
     if not top_products.empty:
-        chart_data = top_products.set_index("product")["revenue"]
-        ax = chart_data.plot(kind="bar", figsize=(10, 6))
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        labels = top_products["product"].astype(str).to_numpy()
+        values = top_products["revenue"].to_numpy()
+        positions = np.arange(len(labels))
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        ax.bar(positions, values, width=0.5)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels, rotation=90)
+        ax.set_xlim(-0.5, len(labels) - 0.5)
         ax.set_title("Top 10 Products by Revenue")
         ax.set_xlabel("Product")
         ax.set_ylabel("Revenue")
-        plt.tight_layout()
-        plt.savefig(chart_path)
-        plt.close()
+        fig.tight_layout()
+        FigureCanvasAgg(fig).print_png(chart_path)
         chart_generated = True
 
     # ---------- 5) Build PDF report ----------
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
     styles = getSampleStyleSheet()
     doc = SimpleDocTemplate(str(summary_pdf_path), pagesize=LETTER)
     story = []
@@ -233,16 +435,7 @@ def main():
     if churn_rate is not None:
         kpi_rows.append(["Customer churn (last 2 months)", f"{churn_rate:,.1f}%"])
 
-    kpi_table = Table(kpi_rows, hAlign="LEFT")
-    kpi_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ]
-        )
-    )
+    kpi_table = _styled_table(kpi_rows)
     story.append(Paragraph("<b>Core Sales KPIs</b>", styles["Heading3"]))
     story.append(kpi_table)
     story.append(Spacer(1, 16))
@@ -251,19 +444,10 @@ def main():
     if not rev_by_region.empty:
         region_rows = [["Region", "Revenue"]]
         region_rows += [
-            [row["region"], f"${row["revenue"]:,.2f}"]
-            for _, row in rev_by_region.iterrows()
+            [region, f"${revenue:,.2f}"]
+            for region, revenue in rev_by_region.itertuples(index=False, name=None)
         ]
-        region_table = Table(region_rows, hAlign="LEFT")
-        region_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ]
-            )
-        )
+        region_table = _styled_table(region_rows)
         story.append(Paragraph("<b>Revenue by Region</b>", styles["Heading3"]))
         story.append(region_table)
         story.append(Spacer(1, 16))
@@ -272,19 +456,10 @@ def main():
     if not top_products.empty:
         prod_rows = [["Product", "Revenue"]]
         prod_rows += [
-            [row["product"], f"${row["revenue"]:,.2f}"]
-            for _, row in top_products.iterrows()
+            [product, f"${revenue:,.2f}"]
+            for product, revenue in top_products.itertuples(index=False, name=None)
         ]
-        prod_table = Table(prod_rows, hAlign="LEFT")
-        prod_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ]
-            )
-        )
+        prod_table = _styled_table(prod_rows)
         story.append(Paragraph("<b>Top 10 Products by Revenue</b>", styles["Heading3"]))
         story.append(prod_table)
         story.append(Spacer(1, 16))
@@ -293,19 +468,10 @@ def main():
     if not top_customers.empty:
         cust_rows = [["Customer", "Revenue"]]
         cust_rows += [
-            [row["customer"], f"${row["revenue"]:,.2f}"]
-            for _, row in top_customers.iterrows()
+            [customer, f"${revenue:,.2f}"]
+            for customer, revenue in top_customers.itertuples(index=False, name=None)
         ]
-        cust_table = Table(cust_rows, hAlign="LEFT")
-        cust_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ]
-            )
-        )
+        cust_table = _styled_table(cust_rows)
         story.append(Paragraph("<b>Top 10 Customers by Revenue</b>", styles["Heading3"]))
         story.append(cust_table)
         story.append(Spacer(1, 16))
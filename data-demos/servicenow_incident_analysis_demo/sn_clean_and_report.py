@@ -1,17 +1,170 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+from functools import lru_cache
 from pathlib import Path
 
-from reportlab.lib.pagesizes import LETTER
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-)
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+# matplotlib and reportlab are imported where they are used, so an empty
+# input only pays for the pandas import
+
+_DATE_FORMATS = ("%Y-%m-%d", "ISO8601", "mixed")
+
+# Report order for priorities; values outside this list are appended after it
+_PRIORITY_LEVELS = ["1 - Critical", "2 - High", "3 - Moderate", "4 - Low"]
+
+
+def _fast_to_datetime(s: pd.Series, formats=_DATE_FORMATS) -> pd.Series:
+    """Parse dates with explicit formats, using "mixed" only for leftover rows."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    # pandas 2.x does not count PyArrow dates/timestamps as datetime64
+    if isinstance(s.dtype, pd.ArrowDtype) and s.dtype.kind == "M":
+        return s.astype("datetime64[ns]")
+    # Exports repeat the same day many times, so parse each distinct string once
+    codes, uniq = pd.factorize(s)
+    if len(uniq) == 0:
+        return pd.to_datetime(s, errors="coerce")
+    uniq = pd.Series(uniq, dtype="string")
+    parsed = pd.Series(pd.NaT, index=uniq.index, dtype="datetime64[ns]")
+    for fmt in formats:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        # Formats can resolve to different units, so align them before assigning
+        parsed[missing] = pd.to_datetime(
+            uniq[missing], format=fmt, errors="coerce"
+        ).astype("datetime64[ns]")
+    # Code -1 marks missing input and is filled with NaT
+    values = pd.DatetimeIndex(parsed).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=s.index, name=s.name)
+
+
+def _read_raw_csv(path: Path, date_cols=(), dtypes=None) -> pd.DataFrame:
+    """Load a raw CSV with the PyArrow parser, falling back to the C parser.
+
+    Columns in ``dtypes`` are typed by the parser itself. If one of them holds
+    a value that type cannot take (text, or a fraction in an integer column),
+    the file is re-read untyped and those columns are coerced, with bad values
+    becoming NA.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    parse_dates = [c for c in date_cols if c in header]
+    dtype_map = {c: t for c, t in (dtypes or {}).items() if c in header}
+
+    def read(dtype):
+        try:
+            return pd.read_csv(
+                path,
+                engine="pyarrow",
+                dtype_backend="pyarrow",
+                dtype=dtype,
+                parse_dates=parse_dates,
+            )
+        except ImportError:
+            return pd.read_csv(path, engine="c", dtype=dtype, parse_dates=parse_dates)
+
+    try:
+        return read(dtype_map)
+    except (ValueError, TypeError):
+        df = read(None)
+        for col in dtype_map:
+            # On a PyArrow column, coerced cells would come back as NaN rather
+            # than NA and slip past fillna, so coerce through plain objects
+            df[col] = pd.to_numeric(df[col].astype(object), errors="coerce")
+        return df
+
+
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Write a CSV with PyArrow's multithreaded writer, falling back to pandas."""
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df.to_csv(path, index=False)
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Match pandas: timestamps that are all midnight are written as plain dates
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            col = table.column(i)
+            dates = col.cast(pa.date32())
+            if pc.all(pc.equal(dates.cast(field.type), col)).as_py():
+                table = table.set_column(i, field.name, dates)
+    pacsv.write_csv(table, str(path), pacsv.WriteOptions(quoting_style="needed"))
+
+
+def _drop_duplicate_records(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Drop repeated records, matching on ``key`` wherever a row has one."""
+    if key not in df.columns:
+        return df.drop_duplicates()
+    keyed = df[key].notna().to_numpy()
+    if keyed.all():
+        return df.drop_duplicates(subset=[key])
+    dupes = df.duplicated(subset=[key]).to_numpy() & keyed
+    # A row without a key only counts as a duplicate if every column matches
+    dupes[~keyed] = df[~keyed].duplicated().to_numpy()
+    return df[~dupes]
+
+
+@lru_cache(maxsize=None)
+def _table_style():
+    """Shared by every report table: grey header row, thin grid, bold header text."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ]
+    )
+
+
+def _styled_table(rows: list):
+    """Left-aligned report table using the shared header/grid style."""
+    from reportlab.platypus import Table
+
+    table = Table(rows, hAlign="LEFT")
+    table.setStyle(_table_style())
+    return table
+
+
+def _emit_empty_report(pdf_path: Path) -> None:
+    """Write a title-only PDF for an input file with no rows."""
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    story = [
+        Paragraph("ServiceNow Incident Health Report", styles["Title"]),
+        Spacer(1, 12),
+        Paragraph("The input file contains no incident records.", styles["BodyText"]),
+    ]
+    SimpleDocTemplate(str(pdf_path), pagesize=LETTER).build(story)
+
+
+def _clean_priority(s: pd.Series) -> pd.Series:
+    """Default missing priorities to Moderate and store them in report order."""
+    s = s.fillna("3 - Moderate")
+    extra = sorted(set(s.unique()) - set(_PRIORITY_LEVELS))
+    return s.astype(pd.CategoricalDtype(_PRIORITY_LEVELS + extra, ordered=True))
+
+
+def _filled_category(default: str):
+    """Cleaner that fills missing labels with ``default`` and casts to category."""
+    return lambda s: s.fillna(default).astype("category")
+
+
+# Column -> cleaner, applied to whichever columns the raw file has. Labels
+# become category so the groupbys below hash integer codes, not strings.
+_CLEANERS = [
+    ("priority", _clean_priority),
+    ("assignment_group", _filled_category("Unassigned Group")),
+    ("assignee", _filled_category("unassigned")),
+    ("opened_at", _fast_to_datetime),
+    ("closed_at", _fast_to_datetime),
+]
 
 
 def build_sn_report(
@@ -27,35 +180,31 @@ def build_sn_report(
     png_path = base / output_png
 
     # ---------- 1) Load & basic cleaning ----------
-    df_raw = pd.read_csv(raw_path)
+    df_raw = _read_raw_csv(
+        raw_path, date_cols=["opened_at", "closed_at"], dtypes={"ttc_hours": "Float32"}
+    )
+    if len(df_raw) == 0:
+        _write_csv(df_raw, clean_path)
+        _emit_empty_report(pdf_path)
+        print(f"No incident rows in {raw_path}; wrote an empty report.")
+        print(f"Report written to {pdf_path.resolve()}")
+        print(f"Cleaned CSV written to {clean_path.resolve()}")
+        return
 
     before = len(df_raw)
-    df = df_raw.drop_duplicates()
+    # The incident number identifies a ticket; rows without one are compared in full
+    df = _drop_duplicate_records(df_raw, "number")
     after = len(df)
     removed_dupes = before - after
 
-    # Normalize columns if they exist
-    if "priority" in df.columns:
-        df["priority"] = df["priority"].fillna("3 - Moderate")
-
-    if "assignment_group" in df.columns:
-        df["assignment_group"] = df["assignment_group"].fillna("Unassigned Group")
-
-    if "assignee" in df.columns:
-        df["assignee"] = df["assignee"].fillna("unassigned")
-
-    # Parse dates if present
-    if "opened_at" in df.columns:
-        df["opened_at"] = pd.to_datetime(df["opened_at"], errors="coerce")
-    if "closed_at" in df.columns:
-        df["closed_at"] = pd.to_datetime(df["closed_at"], errors="coerce")
-
-    # Ensure ttc_hours numeric if present
-    if "ttc_hours" in df.columns:
-        df["ttc_hours"] = pd.to_numeric(df["ttc_hours"], errors="coerce")
+    # Normalize columns if they exist (date parsing is a no-op when read_csv
+    # already parsed the column)
+    df = df.assign(
+        **{col: clean(df[col]) for col, clean in _CLEANERS if col in df.columns}
+    )
 
     # Persist cleaned CSV
-    df.to_csv(clean_path, index=False)
+    _write_csv(df, clean_path)
 
     # ---------- 2) KPI calculations ----------
     total_raw = before
@@ -87,10 +236,10 @@ def build_sn_report(
     # ---------- 3) Breakdown tables ----------
     # Volume by priority
     if "priority" in df.columns:
+        # Counted in category order, so no sort is needed; unused levels dropped
+        pri_counts = df["priority"].value_counts(sort=False)
         pri_counts = (
-            df["priority"]
-            .value_counts()
-            .sort_index()
+            pri_counts[pri_counts > 0]
             .rename_axis("priority")
             .reset_index(name="count")
         )
@@ -100,12 +249,11 @@ def build_sn_report(
     # SLA breach rate by priority
     if {"priority", "sla_breach"} <= set(df.columns):
         pri_breach = (
-            df.groupby("priority")["sla_breach"]
+            df.groupby("priority", observed=True)["sla_breach"]
             .mean()
             .mul(100)
             .rename("breach_rate_pct")
             .reset_index()
-            .sort_values("priority")
         )
     else:
         pri_breach = pd.DataFrame(columns=["priority", "breach_rate_pct"])
@@ -114,10 +262,9 @@ def build_sn_report(
     if {"assignment_group", "ttc_hours"} <= set(df.columns):
         mttr_by_group = (
             df[df["ttc_hours"].notna()]
-            .groupby("assignment_group")["ttc_hours"]
+            .groupby("assignment_group", sort=False, observed=True)["ttc_hours"]
             .mean()
-            .sort_values(ascending=False)
-            .head(10)
+            .nlargest(10)
             .rename("mttr_hours")
             .reset_index()
         )
@@ -126,19 +273,26 @@ def build_sn_report(
 
     # ---------- 3.5) PNG chart: SLA Breach Rate by Priority ----------
     if not pri_breach.empty:
-        fig, ax = plt.subplots(figsize=(8, 5))
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(8, 5))
+        ax = fig.subplots()
         ax.bar(pri_breach["priority"], pri_breach["breach_rate_pct"])
         ax.set_title("SLA Breach Rate by Priority")
         ax.set_xlabel("Priority")
         ax.set_ylabel("Breach Rate (%)")
-        plt.tight_layout()
-        plt.savefig(png_path)
-        plt.close(fig)
+        fig.tight_layout()
+        FigureCanvasAgg(fig).print_png(png_path)
         print(f"PNG chart written to {png_path.resolve()}")
     else:
         print("No data available to generate SLA breach chart PNG.")
 
     # ---------- 4) Build PDF report ----------
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
     styles = getSampleStyleSheet()
     doc = SimpleDocTemplate(str(pdf_path), pagesize=LETTER)
     story = []
@@ -183,16 +337,7 @@ def build_sn_report(
     if mttr_overall is not None:
         kpi_rows.append(["Average time to close (MTTR)", f"{mttr_overall:,.1f} hours"])
 
-    kpi_table = Table(kpi_rows, hAlign="LEFT")
-    kpi_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ]
-        )
-    )
+    kpi_table = _styled_table(kpi_rows)
     story.append(Paragraph("<b>Key KPIs</b>", styles["Heading3"]))
     story.append(kpi_table)
     story.append(Spacer(1, 14))
@@ -201,19 +346,10 @@ def build_sn_report(
     if not pri_counts.empty:
         vol_rows = [["Priority", "Incident Count"]]
         vol_rows += [
-            [row["priority"], f"{int(row['count']):,}"]
-            for _, row in pri_counts.iterrows()
+            [priority, f"{int(count):,}"]
+            for priority, count in pri_counts.itertuples(index=False, name=None)
         ]
-        vol_table = Table(vol_rows, hAlign="LEFT")
-        vol_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ]
-            )
-        )
+        vol_table = _styled_table(vol_rows)
         story.append(Paragraph("<b>Incident Volume by Priority</b>", styles["Heading3"]))
         story.append(vol_table)
         story.append(Spacer(1, 14))
@@ -222,19 +358,10 @@ def build_sn_report(
     if not pri_breach.empty:
         breach_rows = [["Priority", "SLA Breach Rate (%)"]]
         breach_rows += [
-            [row["priority"], f"{row['breach_rate_pct']:,.1f}%"]
-            for _, row in pri_breach.iterrows()
+            [priority, f"{rate:,.1f}%"]
+            for priority, rate in pri_breach.itertuples(index=False, name=None)
         ]
-        breach_table = Table(breach_rows, hAlign="LEFT")
-        breach_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ]
-            )
-        )
+        breach_table = _styled_table(breach_rows)
         story.append(
             Paragraph("<b>SLA Breach Rate by Priority</b>", styles["Heading3"])
         )
@@ -245,19 +372,10 @@ def build_sn_report(
     if not mttr_by_group.empty:
         mttr_rows = [["Assignment Group", "MTTR (hours)"]]
         mttr_rows += [
-            [row["assignment_group"], f"{row['mttr_hours']:,.1f}"]
-            for _, row in mttr_by_group.iterrows()
+            [group, f"{mttr_hours:,.1f}"]
+            for group, mttr_hours in mttr_by_group.itertuples(index=False, name=None)
         ]
-        mttr_table = Table(mttr_rows, hAlign="LEFT")
-        mttr_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ]
-            )
-        )
+        mttr_table = _styled_table(mttr_rows)
         story.append(
             Paragraph("<b>Top 10 Assignment Groups by MTTR</b>", styles["Heading3"])
         )